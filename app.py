@@ -1,4 +1,5 @@
 import streamlit as st
+import hashlib
 import json
 import os
 from datetime import datetime
@@ -13,6 +14,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Number of past generations kept in the session
+MAX_HISTORY_ENTRIES = 50
+
 # Initialize session state
 if 'content_history' not in st.session_state:
     st.session_state.content_history = []
@@ -30,6 +34,27 @@ def initialize_managers():
 
 brand_manager, export_manager = initialize_managers()
 
+@st.cache_data(ttl=60)
+def load_brand_profiles(storage_file, mtime):
+    """Read brand profiles from disk; mtime is part of the cache key so edits invalidate it."""
+    return BrandManager(storage_file).get_brand_profiles()
+
+def get_brand_profiles():
+    """Get brand profiles without re-parsing the file on every rerun."""
+    storage_file = brand_manager.storage_file
+    mtime = os.path.getmtime(storage_file) if os.path.exists(storage_file) else 0.0
+    return load_brand_profiles(storage_file, mtime)
+
+def add_to_history(entry):
+    """Append a generation to the history, replacing an identical earlier request and keeping the newest entries."""
+    brand_context = sorted(st.session_state.current_brand_context.items())
+    request = json.dumps([entry["prompt"], entry["content_types"], entry["platforms"],
+                          entry["num_variations"], brand_context], default=str)
+    key = hashlib.blake2b(request.encode("utf-8"), digest_size=8).hexdigest()
+    history = [item for item in st.session_state.content_history if item.get("key") != key]
+    history.append({**entry, "key": key})
+    st.session_state.content_history = history[-MAX_HISTORY_ENTRIES:]
+
 
 
 st.title("🚀 AI Content Generation Platform")
@@ -40,7 +65,7 @@ with st.sidebar:
     st.header("Brand Context")
     
     # Brand profile selection
-    brand_profiles = brand_manager.get_brand_profiles()
+    brand_profiles = get_brand_profiles()
     if brand_profiles:
         selected_brand = st.selectbox("Select Brand Profile", ["New Brand"] + list(brand_profiles.keys()))
         if selected_brand != "New Brand":
@@ -69,9 +94,18 @@ with st.sidebar:
                 "key_values": key_values
             }
             brand_manager.save_brand_profile(brand_name, brand_context)
+            load_brand_profiles.clear()
             st.session_state.current_brand_context = brand_context
             st.success("Brand profile saved!")
             st.rerun()
+    
+    # Response cache settings
+    st.header("Settings")
+    disable_cache = st.checkbox("Disable cache", help="Always call the API instead of reusing identical past responses")
+    match_normalized = st.checkbox("Ignore case and punctuation when reusing responses", value=False, disabled=disable_cache,
+                                   help="Treat prompts that differ only in casing, spacing or punctuation as identical")
+    cache_stats = content_generator.response_cache.get_stats()
+    st.caption(f"Cache hits: {cache_stats['hits']} | normalized-prompt hits: {cache_stats['normalized_hits']} | misses: {cache_stats['misses']}")
 
 # Main content area
 col1, col2 = st.columns([1, 1])
@@ -107,26 +141,52 @@ with col1:
     # Generate button
     if st.button("Generate Content", type="primary"):
         if user_prompt and content_types:
-            with st.spinner("Generating content..."):
-                try:
-                    generated = content_generator.generate_content(
-                        prompt=user_prompt,
-                        content_types=content_types,
-                        platforms=platforms,
-                        brand_context=st.session_state.current_brand_context,
-                        num_variations=num_variations
-                    )
-                    st.session_state.generated_content = generated
-                    st.session_state.content_history.append({
-                        "timestamp": datetime.now().isoformat(),
-                        "prompt": user_prompt,
-                        "content_types": content_types,
-                        "platforms": platforms,
-                        "content": generated
-                    })
-                    st.success("Content generated successfully!")
-                except Exception as e:
-                    st.error(f"Error generating content: {str(e)}")
+            try:
+                content_type = content_types[0]
+                # JSON-mode types would stream raw JSON, so they use the spinner instead
+                is_single_preview = (num_variations == 1 and len(content_types) == 1 and len(platforms) <= 1
+                                     and content_type in content_generator.CONTENT_TYPE_TEMPLATES
+                                     and content_type not in content_generator.JSON_CONTENT_TYPES)
+                if is_single_preview:
+                    # Stream a single preview so text appears as soon as the first tokens arrive
+                    platform = (platforms or ["Instagram"])[0] if content_type == "Social Media Captions" else None
+                    placeholder = st.empty()
+                    tokens = []
+                    for token in content_generator.stream_content(user_prompt, content_type,
+                                                                  st.session_state.current_brand_context, platform,
+                                                                  use_cache=not disable_cache,
+                                                                  match_normalized=match_normalized):
+                        tokens.append(token)
+                        placeholder.markdown("".join(tokens))
+                    placeholder.empty()
+                    response = "".join(tokens).strip()
+                    if platform:
+                        generated = {content_type: [{platform: response}]}
+                    else:
+                        generated = {content_type: [content_generator.parse_response(content_type, response)]}
+                else:
+                    with st.spinner("Generating content..."):
+                        generated = content_generator.generate_content(
+                            prompt=user_prompt,
+                            content_types=content_types,
+                            platforms=platforms,
+                            brand_context=st.session_state.current_brand_context,
+                            num_variations=num_variations,
+                            use_cache=not disable_cache,
+                            match_normalized=match_normalized
+                        )
+                st.session_state.generated_content = generated
+                add_to_history({
+                    "timestamp": datetime.now().isoformat(),
+                    "prompt": user_prompt,
+                    "content_types": content_types,
+                    "platforms": platforms,
+                    "num_variations": num_variations,
+                    "content": generated
+                })
+                st.success("Content generated successfully!")
+            except Exception as e:
+                st.error(f"Error generating content: {str(e)}")
         else:
             st.error("Please enter a prompt and select at least one content type.")
 
@@ -160,7 +220,9 @@ with col2:
                                             original_content=variation,
                                             edit_instruction=edit_instruction,
                                             content_type=content_type,
-                                            brand_context=st.session_state.current_brand_context
+                                            brand_context=st.session_state.current_brand_context,
+                                            use_cache=not disable_cache,
+                                            match_normalized=match_normalized
                                         )
                                         # Replace the variation with edited content
                                         st.session_state.generated_content[content_type][i-1] = edited
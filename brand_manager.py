@@ -1,5 +1,6 @@
-import json
 import os
+import tempfile
+import orjson
 from typing import Dict, Any, List
 
 class BrandManager:
@@ -8,23 +9,33 @@ class BrandManager:
     def __init__(self, storage_file: str = "brand_profiles.json"):
         self.storage_file = storage_file
         self.profiles = self._load_profiles()
+        self._search_index: Dict[str, str] = {}
+        self._rebuild_search_index()
     
     def _load_profiles(self) -> Dict[str, Dict[str, Any]]:
         """Load brand profiles from storage file."""
         if os.path.exists(self.storage_file):
             try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
+                with open(self.storage_file, 'rb') as f:
+                    return orjson.loads(f.read())
+            except (orjson.JSONDecodeError, IOError):
                 return {}
         return {}
     
     def _save_profiles(self) -> None:
         """Save brand profiles to storage file."""
+        # Write to a uniquely named temporary file and swap it in, so a crash mid-write never leaves a
+        # truncated file and concurrent sessions never write to the same temporary file
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.storage_file)) or ".")
         try:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.profiles, f, indent=2, ensure_ascii=False)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(self.profiles, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.storage_file)
         except IOError as e:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             raise Exception(f"Failed to save brand profiles: {str(e)}")
     
     def save_brand_profile(self, brand_name: str, profile_data: Dict[str, Any]) -> None:
@@ -37,6 +48,7 @@ class BrandManager:
             "created_at": profile_data.get("created_at", self._get_timestamp()),
             "updated_at": self._get_timestamp()
         }
+        self._index_profile(brand_name)
         self._save_profiles()
     
     def get_brand_profile(self, brand_name: str) -> Dict[str, Any]:
@@ -51,6 +63,7 @@ class BrandManager:
         """Delete a brand profile."""
         if brand_name in self.profiles:
             del self.profiles[brand_name]
+            self._search_index.pop(brand_name, None)
             self._save_profiles()
             return True
         return False
@@ -60,6 +73,7 @@ class BrandManager:
         if brand_name in self.profiles:
             self.profiles[brand_name].update(updates)
             self.profiles[brand_name]["updated_at"] = self._get_timestamp()
+            self._index_profile(brand_name)
             self._save_profiles()
         else:
             raise ValueError(f"Brand profile '{brand_name}' not found")
@@ -67,15 +81,27 @@ class BrandManager:
     def search_profiles(self, query: str) -> List[Dict[str, Any]]:
         """Search brand profiles by name, industry, or values."""
         query_lower = query.lower()
-        results = []
-        
-        for name, profile in self.profiles.items():
-            if (query_lower in name.lower() or 
-                query_lower in profile.get('industry', '').lower() or
-                query_lower in profile.get('key_values', '').lower()):
-                results.append({"name": name, **profile})
-        
-        return results
+        return [
+            {"name": name, **self.profiles[name]}
+            for name, haystack in self._search_index.items()
+            if query_lower in haystack
+        ]
+    
+    def _index_profile(self, brand_name: str) -> None:
+        """Store the lowercased searchable text for a profile."""
+        profile = self.profiles[brand_name]
+        # Newline-separated so a query never matches across two fields
+        self._search_index[brand_name] = "\n".join([
+            brand_name,
+            profile.get('industry') or '',
+            profile.get('key_values') or ''
+        ]).lower()
+    
+    def _rebuild_search_index(self) -> None:
+        """Rebuild the search index for all profiles."""
+        self._search_index = {}
+        for name in self.profiles:
+            self._index_profile(name)
     
     def get_profile_summary(self, brand_name: str) -> str:
         """Get a formatted summary of a brand profile."""
@@ -98,23 +124,24 @@ class BrandManager:
     
     def export_profiles(self) -> str:
         """Export all profiles as JSON string."""
-        return json.dumps(self.profiles, indent=2, ensure_ascii=False)
+        return orjson.dumps(self.profiles, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
     
     def import_profiles(self, profiles_json: str, overwrite: bool = False) -> int:
         """Import profiles from JSON string. Returns number of profiles imported."""
         try:
-            imported_profiles = json.loads(profiles_json)
+            imported_profiles = orjson.loads(profiles_json)
             imported_count = 0
             
             for name, profile in imported_profiles.items():
                 if overwrite or name not in self.profiles:
                     self.profiles[name] = profile
+                    self._index_profile(name)
                     imported_count += 1
             
             self._save_profiles()
             return imported_count
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {str(e)}")
     
     def _get_timestamp(self) -> str:
@@ -1,88 +1,306 @@
-import os
-import json
+import re
+import random
+import asyncio
+import threading
 import time
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv, find_dotenv
-from langchain_groq import ChatGroq
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Coroutine, Iterator
+import groq
+import orjson
 from langchain_core.messages import HumanMessage
-from prompt_templates import get_prompt_templates
-
-# Load environment variables
-load_dotenv(find_dotenv())
-
-# Global LLM instance
-_llm = None
-
-def load_llm(groq_api_key: Optional[str] = None) -> ChatGroq:
-    """Load Groq LLM instance."""
-    api_key = groq_api_key or os.environ.get("GROQ_API_KEY", "---")
-    if not api_key:
-        raise ValueError("GROQ_API_KEY is required")
-    return ChatGroq(
-        groq_api_key=api_key,
-        model_name="llama3-8b-8192",
-        temperature=0.3,
-        max_tokens=512
+from llm import MODEL_NAME, TEMPERATURE, MAX_TOKENS, load_llm, get_llm
+from prompt_templates import render
+from response_cache import ResponseCache
+
+# Maximum in-flight requests to Groq, to respect rate limits
+MAX_CONCURRENT_REQUESTS = 8
+
+# Retry policy: statuses worth retrying (other 4xx errors are permanent) and the backoff ceiling
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 8
+
+# Prompt template used for each content type
+CONTENT_TYPE_TEMPLATES = {
+    "Ad Copy": "ad_copy",
+    "Social Media Captions": "social_caption",
+    "Email Creative Blocks": "email",
+    "Video Scripts": "video_script",
+    "Image Prompts": "image_prompt"
+}
+
+# Content types whose variations are requested in a single call, with their batch template
+BATCH_TEMPLATES = {
+    "Ad Copy": "ad_copy_batch"
+}
+
+# Content types whose templates ask for a JSON object, requested with Groq's JSON mode
+JSON_CONTENT_TYPES = {"Ad Copy", "Email Creative Blocks"}
+_JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Brand profile fields included in prompts, with their labels
+_BRAND_CONTEXT_FIELDS = (
+    ("brand_name", "Brand"),
+    ("target_audience", "Target Audience"),
+    ("brand_tone", "Tone"),
+    ("industry", "Industry"),
+    ("key_values", "Key Values")
+)
+
+# Labelled sections in ad copy and email responses, mapped to result keys; keys may be quoted as in JSON
+_AD_COPY_RE = re.compile(r'^[ \t]*"?(headline|subtext|cta)"?[ \t]*:[ \t]*(.*)$', re.IGNORECASE | re.MULTILINE)
+_AD_COPY_FIELDS = {"headline": "headline", "subtext": "subtext", "cta": "cta"}
+_EMAIL_RE = re.compile(r'^[ \t]*"?(subject|header|product|cta)(?:_line|_blurb|_button)?"?[ \t]*:[ \t]*(.*)$',
+                       re.IGNORECASE | re.MULTILINE)
+_EMAIL_FIELDS = {"subject": "subject_line", "header": "header", "product": "product_blurb", "cta": "cta_button"}
+
+# Background event loop shared by all API calls, so the client's async connection pool stays on one loop
+_loop = None
+_loop_lock = threading.Lock()
+_api_semaphore = None
+
+# Shared response cache
+response_cache = ResponseCache()
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get or start the background event loop."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="groq-event-loop", daemon=True).start()
+    return _loop
+
+def _run_async(coro: Coroutine) -> Any:
+    """Run a coroutine on the background event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()
+
+async def _gather_api_calls(
+    calls: List[Tuple[str, int, bool]],
+    use_cache: bool = True,
+    match_normalized: bool = False
+) -> List[Any]:
+    """Issue (prompt, variation, json_mode) calls concurrently, returning responses (or raised exceptions) in order."""
+    return await asyncio.gather(
+        *(amake_api_call(prompt, variation=variation, json_mode=json_mode, use_cache=use_cache,
+                         match_normalized=match_normalized)
+          for prompt, variation, json_mode in calls),
+        return_exceptions=True
     )
 
-def get_llm():
-    """Get or create LLM instance."""
-    global _llm
-    if _llm is None:
-        _llm = load_llm()
-    return _llm
+def make_api_call(
+    prompt: str,
+    max_retries: int = 3,
+    variation: int = 0,
+    json_mode: bool = False,
+    use_cache: bool = True,
+    match_normalized: bool = False
+) -> str:
+    """Make API call to Groq with retry logic, serving repeated calls from the cache unless use_cache is False.
+    
+    match_normalized also reuses responses to prompts that differ only in case, whitespace or punctuation;
+    only responses generated with match_normalized on are stored under the normalized key.
+    """
+    return _run_async(amake_api_call(prompt, max_retries, variation, json_mode, use_cache, match_normalized))
 
-def make_api_call(prompt: str, max_retries: int = 3) -> str:
-    """Make API call to Groq with retry logic."""
-    llm = get_llm()
-    for attempt in range(max_retries):
+async def amake_api_call(
+    prompt: str,
+    max_retries: int = 3,
+    variation: int = 0,
+    json_mode: bool = False,
+    use_cache: bool = True,
+    match_normalized: bool = False
+) -> str:
+    """Async version of make_api_call; must run on the background event loop."""
+    global _api_semaphore
+    if _api_semaphore is None:
+        _api_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    cache_key, normalized_key = _cache_keys(prompt, variation, json_mode, match_normalized)
+    if use_cache:
+        cached = response_cache.get(cache_key, normalized_key)
+        if cached is not None:
+            return cached
+    
+    llm = _get_model(json_mode)
+    attempt = 0
+    while attempt < max_retries:
         try:
             message = HumanMessage(content=prompt)
-            response = llm.invoke([message])
+            async with _api_semaphore:
+                response = await llm.ainvoke([message])
             if hasattr(response, 'content'):
-                return response.content.strip()
+                content = response.content.strip()
             else:
-                return str(response).strip()
+                content = str(response).strip()
+            if use_cache:
+                response_cache.set(cache_key, content, normalized_key)
+            return content
             
         except Exception as e:
-            if attempt == max_retries - 1:
-                raise Exception(f"Groq API call failed after {max_retries} attempts: {str(e)}")
-            time.sleep(2 ** attempt)
+            if json_mode and _is_json_validation_error(e):
+                # Ask once more without JSON mode; the parsers fall back to "Label: value" text
+                json_mode = False
+                llm = _get_model(False)
+                continue
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries - 1:
+                raise Exception(f"Groq API call failed after {attempt + 1} attempts: {str(e)}")
+            await asyncio.sleep(delay)
+            attempt += 1
     
     raise Exception("Failed to generate content after all retries")
+
+def _is_json_validation_error(error: Exception) -> bool:
+    """Whether Groq rejected a JSON-mode response (HTTP 400 json_validate_failed) because it was not valid JSON."""
+    return (isinstance(error, groq.APIStatusError) and error.status_code == 400
+            and "json_validate_failed" in str(error))
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after error, or None if it is not retryable."""
+    if isinstance(error, groq.APIStatusError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                # Honour the server's hint, but never block callers longer than the backoff ceiling
+                return min(MAX_BACKOFF_SECONDS, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+    
+    # Jittered exponential backoff so concurrent callers don't retry in lockstep
+    return min(MAX_BACKOFF_SECONDS, 2 ** attempt) * (0.5 + random.random())
+
+def make_api_call_stream(
+    prompt: str,
+    variation: int = 0,
+    json_mode: bool = False,
+    use_cache: bool = True,
+    match_normalized: bool = False,
+    max_retries: int = 3
+) -> Iterator[str]:
+    """Stream a Groq response chunk by chunk; a cached response is yielded whole.
+    
+    Failures before the first chunk are retried like make_api_call; later failures are raised.
+    """
+    cache_key, normalized_key = _cache_keys(prompt, variation, json_mode, match_normalized)
+    if use_cache:
+        cached = response_cache.get(cache_key, normalized_key)
+        if cached is not None:
+            yield cached
+            return
+    
+    llm = _get_model(json_mode)
+    for attempt in range(max_retries):
+        stream = llm.stream([HumanMessage(content=prompt)])
+        try:
+            # Connection and status errors surface when the first chunk is requested
+            first_chunk = next(stream, None)
+            break
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == max_retries - 1:
+                raise Exception(f"Groq API call failed after {attempt + 1} attempts: {str(e)}")
+            time.sleep(delay)
+    else:
+        # Only reached when max_retries < 1, matching amake_api_call
+        raise Exception("Failed to generate content after all retries")
+    
+    chunks = []
+    if first_chunk is not None:
+        chunks.append(first_chunk.content)
+        yield first_chunk.content
+    for chunk in stream:
+        chunks.append(chunk.content)
+        yield chunk.content
+    if use_cache:
+        response_cache.set(cache_key, "".join(chunks).strip(), normalized_key)
+
+def _get_model(json_mode: bool) -> Any:
+    """Get the shared LLM, bound to JSON output when json_mode is set."""
+    llm = get_llm()
+    return llm.bind(response_format=_JSON_RESPONSE_FORMAT) if json_mode else llm
+
+def _cache_keys(prompt: str, variation: int, json_mode: bool, match_normalized: bool) -> Tuple[str, Optional[str]]:
+    """Get the exact response cache key for a call, plus the normalized-prompt key when match_normalized is set."""
+    cache_key = ResponseCache.make_key(MODEL_NAME, TEMPERATURE, MAX_TOKENS, prompt, variation, json_mode)
+    if not match_normalized:
+        return cache_key, None
+    return cache_key, ResponseCache.make_normalized_key(MODEL_NAME, TEMPERATURE, MAX_TOKENS, prompt, variation, json_mode)
     
 def generate_content(
     prompt: str,
     content_types: List[str],
     platforms: Optional[List[str]] = None,
     brand_context: Optional[Dict[str, Any]] = None,
-    num_variations: int = 3
+    num_variations: int = 3,
+    use_cache: bool = True,
+    match_normalized: bool = False
 ) -> Dict[str, List[Any]]:
-    """Generate content based on prompt and specifications."""
-    results = {}
-    
+    """Generate content based on prompt and specifications; use_cache=False always calls the API."""
     # Prepare brand context string
     brand_context_str = ""
     if brand_context:
         brand_context_str = format_brand_context(brand_context)
     
+    # Build one task per API call up front so all of them can be issued concurrently
+    tasks = []
+    for content_type in content_types:
+        if content_type not in CONTENT_TYPE_TEMPLATES:
+            continue
+        if content_type in BATCH_TEMPLATES and num_variations > 1:
+            # One call returns every variation (variation=None marks the batch task)
+            full_prompt = build_batch_prompt(content_type, prompt, brand_context_str, num_variations)
+            tasks.append((content_type, None, None, full_prompt))
+        else:
+            tasks.extend(_variation_tasks(content_type, prompt, brand_context_str, platforms, num_variations))
+    
+    outcomes = _run_async(_gather_api_calls([_api_call_args(task) for task in tasks], use_cache, match_normalized))
+    
+    # Unpack batch responses; a batch that fails to parse falls back to one call per variation
+    batched = {}
+    fallback_tasks = []
+    for (content_type, variation, _, _), outcome in zip(tasks, outcomes):
+        if variation is not None:
+            continue
+        batch = None if isinstance(outcome, BaseException) else parse_batch_response(content_type, outcome, num_variations)
+        if batch is None:
+            fallback_tasks.extend(_variation_tasks(content_type, prompt, brand_context_str, platforms, num_variations))
+        else:
+            for i, content in enumerate(batch):
+                batched[(content_type, i)] = content
+    
+    if fallback_tasks:
+        tasks += fallback_tasks
+        outcomes += _run_async(_gather_api_calls([_api_call_args(task) for task in fallback_tasks], use_cache, match_normalized))
+    
+    # Group responses back by (content_type, variation), preserving platform order
+    responses = {}
+    for (content_type, variation, platform, _), outcome in zip(tasks, outcomes):
+        if variation is not None:
+            responses.setdefault((content_type, variation), []).append((platform, outcome))
+    
+    results = {}
     for content_type in content_types:
         results[content_type] = []
         
         for variation in range(num_variations):
             try:
-                if content_type == "Ad Copy":
-                    content = generate_ad_copy(prompt, brand_context_str)
+                if content_type not in CONTENT_TYPE_TEMPLATES:
+                    content = "Content type not supported"
+                elif (content_type, variation) in batched:
+                    content = batched[(content_type, variation)]
                 elif content_type == "Social Media Captions":
-                    content = generate_social_captions(prompt, platforms or ["Instagram"], brand_context_str)
-                elif content_type == "Email Creative Blocks":
-                    content = generate_email_blocks(prompt, brand_context_str)
-                elif content_type == "Video Scripts":
-                    content = generate_video_script(prompt, brand_context_str)
-                elif content_type == "Image Prompts":
-                    content = generate_image_prompts(prompt, brand_context_str)
+                    content = {}
+                    for platform, outcome in responses[(content_type, variation)]:
+                        if isinstance(outcome, BaseException):
+                            raise outcome
+                        content[platform] = outcome
                 else:
-                    content = "Content type not supported"
+                    _, outcome = responses[(content_type, variation)][0]
+                    if isinstance(outcome, BaseException):
+                        raise outcome
+                    content = parse_response(content_type, outcome)
                 
                 results[content_type].append(content)
                 
@@ -90,40 +308,117 @@ def generate_content(
                 results[content_type].append(f"Error generating variation {variation + 1}: {str(e)}")
     
     return results
+
+def _variation_tasks(
+    content_type: str,
+    prompt: str,
+    brand_context: str,
+    platforms: Optional[List[str]],
+    num_variations: int
+) -> List[Tuple[str, int, Optional[str], str]]:
+    """Build one (content_type, variation, platform, prompt) task per API call."""
+    task_platforms = (platforms or ["Instagram"]) if content_type == "Social Media Captions" else [None]
+    tasks = []
+    for variation in range(num_variations):
+        for platform in task_platforms:
+            full_prompt = build_prompt(content_type, prompt, brand_context, platform, variation, num_variations)
+            tasks.append((content_type, variation, platform, full_prompt))
+    return tasks
+
+def _api_call_args(task: Tuple[str, Optional[int], Optional[str], str]) -> Tuple[str, int, bool]:
+    """Convert a generation task into (prompt, variation, json_mode) call arguments."""
+    content_type, variation, _, full_prompt = task
+    return full_prompt, variation or 0, content_type in JSON_CONTENT_TYPES
+
+def stream_content(
+    prompt: str,
+    content_type: str,
+    brand_context: Optional[Dict[str, Any]] = None,
+    platform: Optional[str] = None,
+    use_cache: bool = True,
+    match_normalized: bool = False
+) -> Iterator[str]:
+    """Stream the raw response for a single variation of a content type.
+    
+    Content types in JSON_CONTENT_TYPES stream raw JSON; display them with generate_content instead.
+    """
+    brand_context_str = ""
+    if brand_context:
+        brand_context_str = format_brand_context(brand_context)
     
-def generate_ad_copy(prompt: str, brand_context: str) -> Dict[str, str]:
-    """Generate ad copy with headlines, subtext, and CTAs."""
-    templates = get_prompt_templates()
-    template = templates["ad_copy"]
-    full_prompt = template.format(
+    full_prompt = build_prompt(content_type, prompt, brand_context_str, platform)
+    return make_api_call_stream(full_prompt, json_mode=content_type in JSON_CONTENT_TYPES,
+                                use_cache=use_cache, match_normalized=match_normalized)
+
+def build_prompt(
+    content_type: str,
+    prompt: str,
+    brand_context: str,
+    platform: Optional[str] = None,
+    variation: int = 0,
+    num_variations: int = 1
+) -> str:
+    """Fill the prompt template for a content type.
+    
+    The variation note is appended last so all variations share the same prompt prefix.
+    """
+    full_prompt = render(
+        CONTENT_TYPE_TEMPLATES[content_type],
+        brand_context=brand_context,
+        product_prompt=prompt,
+        platform=platform
+    )
+    if num_variations > 1:
+        full_prompt += (f"\n\nThis is variation {variation + 1} of {num_variations}. "
+                        "Make it clearly different from the other variations in angle and wording.")
+    return full_prompt
+
+def build_batch_prompt(content_type: str, prompt: str, brand_context: str, num_variations: int) -> str:
+    """Fill the template that asks for all variations of a content type in one response."""
+    return render(
+        BATCH_TEMPLATES[content_type],
         brand_context=brand_context,
-        product_prompt=prompt
+        product_prompt=prompt,
+        num_variations=num_variations
     )
+
+def parse_batch_response(content_type: str, response: str, num_variations: int) -> Optional[List[Any]]:
+    """Parse a batch response into num_variations items, or None if it is unusable."""
+    parsers = {
+        "Ad Copy": parse_ad_copy_batch
+    }
+    return parsers[content_type](response, num_variations)
+
+def parse_response(content_type: str, response: str) -> Any:
+    """Convert a raw LLM response into the structure used for a content type."""
+    parsers = {
+        "Ad Copy": parse_ad_copy,
+        "Email Creative Blocks": parse_email_blocks,
+        "Video Scripts": parse_video_script,
+        "Image Prompts": parse_image_prompts
+    }
+    parser = parsers.get(content_type)
+    return parser(response) if parser else response
     
-    response = make_api_call(full_prompt)
+def generate_ad_copy(prompt: str, brand_context: str, variation: int = 0) -> Dict[str, str]:
+    """Generate ad copy with headlines, subtext, and CTAs."""
+    full_prompt = build_prompt("Ad Copy", prompt, brand_context)
+    response = make_api_call(full_prompt, variation=variation, json_mode=True)
+    return parse_ad_copy(response)
+
+def parse_ad_copy(response: str) -> Dict[str, str]:
+    """Parse an ad copy response into headline, subtext, and CTA."""
+    ad_copy = _parse_json_fields(response, ("headline", "subtext", "cta"))
+    if ad_copy is not None:
+        return ad_copy
     
-    # Parse response into structured format
-    lines = response.split('\n')
+    # Fall back to "Label: value" text
     ad_copy = {
         "headline": "",
         "subtext": "",
         "cta": ""
     }
-    
-    current_section = None
-    for line in lines:
-        line = line.strip()
-        if line.lower().startswith('headline:'):
-            current_section = 'headline'
-            ad_copy[current_section] = line.replace('Headline:', '').strip()
-        elif line.lower().startswith('subtext:'):
-            current_section = 'subtext'
-            ad_copy[current_section] = line.replace('Subtext:', '').strip()
-        elif line.lower().startswith('cta:'):
-            current_section = 'cta'
-            ad_copy[current_section] = line.replace('CTA:', '').strip()
-        elif current_section and line:
-            ad_copy[current_section] += " " + line
+    _parse_sections(response, _AD_COPY_RE, _AD_COPY_FIELDS, ad_copy, continuation=True)
     
     # Fallback if parsing fails
     if not any(ad_copy.values()):
@@ -143,77 +438,77 @@ def generate_ad_copy(prompt: str, brand_context: str) -> Dict[str, str]:
     
     return ad_copy
     
-def generate_social_captions(prompt: str, platforms: List[str], brand_context: str) -> Dict[str, str]:
+def parse_ad_copy_batch(response: str, num_variations: int) -> Optional[List[Dict[str, str]]]:
+    """Parse a batch of ad copies; returns None unless it holds exactly num_variations objects."""
+    data = _load_json_object(response)
+    items = data.get("variations") if isinstance(data, dict) else None
+    if items is None:
+        # Without JSON mode, models sometimes return a bare array wrapped in prose or code fences
+        start, end = response.find('['), response.rfind(']')
+        if start == -1 or end < start:
+            return None
+        try:
+            items = orjson.loads(response[start:end + 1])
+        except orjson.JSONDecodeError:
+            return None
+    
+    if not isinstance(items, list) or len(items) != num_variations:
+        return None
+    if not all(isinstance(item, dict) for item in items):
+        return None
+    
+    return [
+        {key: str(item.get(key, "")).strip() for key in ("headline", "subtext", "cta")}
+        for item in items
+    ]
+    
+def generate_social_captions(prompt: str, platforms: List[str], brand_context: str, variation: int = 0) -> Dict[str, str]:
     """Generate social media captions for different platforms."""
+    tasks = [
+        ("Social Media Captions", variation, platform, build_prompt("Social Media Captions", prompt, brand_context, platform))
+        for platform in platforms
+    ]
+    responses = _run_async(_gather_api_calls([_api_call_args(task) for task in tasks]))
+    
     captions = {}
-    templates = get_prompt_templates()
-    
-    for platform in platforms:
-        template = templates["social_caption"]
-        full_prompt = template.format(
-            brand_context=brand_context,
-            product_prompt=prompt,
-            platform=platform
-        )
-        
-        response = make_api_call(full_prompt)
+    for platform, response in zip(platforms, responses):
+        if isinstance(response, BaseException):
+            raise response
         captions[platform] = response
     
     return captions
     
-def generate_email_blocks(prompt: str, brand_context: str) -> Dict[str, str]:
+def generate_email_blocks(prompt: str, brand_context: str, variation: int = 0) -> Dict[str, str]:
     """Generate email creative blocks."""
-    templates = get_prompt_templates()
-    template = templates["email"]
-    full_prompt = template.format(
-        brand_context=brand_context,
-        product_prompt=prompt
-    )
-    
-    response = make_api_call(full_prompt)
+    full_prompt = build_prompt("Email Creative Blocks", prompt, brand_context)
+    response = make_api_call(full_prompt, variation=variation, json_mode=True)
+    return parse_email_blocks(response)
+
+def parse_email_blocks(response: str) -> Dict[str, str]:
+    """Parse an email response into subject, header, product blurb, and CTA."""
+    email_blocks = _parse_json_fields(response, ("subject_line", "header", "product_blurb", "cta_button"))
+    if email_blocks is not None:
+        return email_blocks
     
-    # Parse into email components
+    # Fall back to "Label: value" text
     email_blocks = {
         "subject_line": "",
         "header": "",
         "product_blurb": "",
         "cta_button": ""
     }
-    
-    lines = response.split('\n')
-    current_section = None
-    
-    for line in lines:
-        line = line.strip()
-        if line.lower().startswith('subject:'):
-            current_section = 'subject_line'
-            email_blocks[current_section] = line.replace('Subject:', '').strip()
-        elif line.lower().startswith('header:'):
-            current_section = 'header'
-            email_blocks[current_section] = line.replace('Header:', '').strip()
-        elif line.lower().startswith('product:'):
-            current_section = 'product_blurb'
-            email_blocks[current_section] = line.replace('Product:', '').strip()
-        elif line.lower().startswith('cta:'):
-            current_section = 'cta_button'
-            email_blocks[current_section] = line.replace('CTA:', '').strip()
-        elif current_section and line:
-            email_blocks[current_section] += " " + line
+    _parse_sections(response, _EMAIL_RE, _EMAIL_FIELDS, email_blocks, continuation=True)
     
     return email_blocks
     
-def generate_video_script(prompt: str, brand_context: str) -> Dict[str, str]:
+def generate_video_script(prompt: str, brand_context: str, variation: int = 0) -> Dict[str, str]:
     """Generate UGC-style video script."""
-    templates = get_prompt_templates()
-    template = templates["video_script"]
-    full_prompt = template.format(
-        brand_context=brand_context,
-        product_prompt=prompt
-    )
-    
-    response = make_api_call(full_prompt)
-    
-    # Structure the script
+    full_prompt = build_prompt("Video Scripts", prompt, brand_context)
+    response = make_api_call(full_prompt, variation=variation)
+    return parse_video_script(response)
+
+def parse_video_script(response: str) -> Dict[str, str]:
+    """Structure a video script response into hook, main content, and CTA."""
     script = {
         "hook": "",
         "main_content": "",
@@ -232,18 +527,14 @@ def generate_video_script(prompt: str, brand_context: str) -> Dict[str, str]:
     
     return script
     
-def generate_image_prompts(prompt: str, brand_context: str) -> List[str]:
+def generate_image_prompts(prompt: str, brand_context: str, variation: int = 0) -> List[str]:
     """Generate image prompts for AI art tools."""
-    templates = get_prompt_templates()
-    template = templates["image_prompt"]
-    full_prompt = template.format(
-        brand_context=brand_context,
-        product_prompt=prompt
-    )
-    
-    response = make_api_call(full_prompt)
-    
-    # Extract multiple prompts
+    full_prompt = build_prompt("Image Prompts", prompt, brand_context)
+    response = make_api_call(full_prompt, variation=variation)
+    return parse_image_prompts(response)
+
+def parse_image_prompts(response: str) -> List[str]:
+    """Extract individual image prompts from a response."""
     prompts = []
     lines = response.split('\n')
     for line in lines:
@@ -260,36 +551,36 @@ def edit_content(
     original_content: Any,
     edit_instruction: str,
     content_type: str,
-    brand_context: Optional[Dict[str, Any]] = None
+    brand_context: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+    match_normalized: bool = False
 ) -> Any:
     """Edit existing content based on instruction."""
     brand_context_str = ""
     if brand_context:
         brand_context_str = format_brand_context(brand_context)
     
-    templates = get_prompt_templates()
-    template = templates["edit"]
-    
     # Convert content to string for editing
     if isinstance(original_content, dict):
-        content_str = json.dumps(original_content, indent=2)
+        content_str = orjson.dumps(original_content, option=orjson.OPT_INDENT_2).decode()
     else:
         content_str = str(original_content)
     
-    full_prompt = template.format(
+    full_prompt = render(
+        "edit",
         brand_context=brand_context_str,
         original_content=content_str,
         edit_instruction=edit_instruction,
         content_type=content_type
     )
     
-    response = make_api_call(full_prompt)
+    response = make_api_call(full_prompt, use_cache=use_cache, match_normalized=match_normalized)
     
     # Try to maintain original structure
     if isinstance(original_content, dict):
         try:
             # Try to parse as JSON first
-            return json.loads(response)
+            return orjson.loads(response)
         except:
             # If JSON parsing fails, try to extract structured data
             if content_type == "Ad Copy":
@@ -306,50 +597,89 @@ def format_brand_context(brand_context: Dict[str, Any]) -> str:
     if not brand_context:
         return ""
     
+    values = tuple(brand_context.get(field) for field, _ in _BRAND_CONTEXT_FIELDS)
+    try:
+        return _format_brand_context_values(values)
+    except TypeError:
+        # Unhashable values (e.g. lists from imported profiles) cannot be cached
+        return _format_brand_context_values.__wrapped__(values)
+
+@lru_cache(maxsize=128)
+def _format_brand_context_values(values: Tuple[Any, ...]) -> str:
+    """Format brand context field values, in _BRAND_CONTEXT_FIELDS order."""
     context_parts = []
-    if brand_context.get('brand_name'):
-        context_parts.append(f"Brand: {brand_context['brand_name']}")
-    if brand_context.get('target_audience'):
-        context_parts.append(f"Target Audience: {brand_context['target_audience']}")
-    if brand_context.get('brand_tone'):
-        context_parts.append(f"Tone: {brand_context['brand_tone']}")
-    if brand_context.get('industry'):
-        context_parts.append(f"Industry: {brand_context['industry']}")
-    if brand_context.get('key_values'):
-        context_parts.append(f"Key Values: {brand_context['key_values']}")
+    for (_, label), value in zip(_BRAND_CONTEXT_FIELDS, values):
+        if value:
+            context_parts.append(f"{label}: {value}")
     
     return "\n".join(context_parts)
 
 def parse_ad_copy_from_text(text: str) -> Dict[str, str]:
     """Parse ad copy from unstructured text."""
     ad_copy = {"headline": "", "subtext": "", "cta": ""}
-    
-    lines = text.split('\n')
-    for line in lines:
-        line = line.strip()
-        if line.lower().startswith('headline:'):
-            ad_copy['headline'] = line.replace('Headline:', '').strip()
-        elif line.lower().startswith('subtext:'):
-            ad_copy['subtext'] = line.replace('Subtext:', '').strip()
-        elif line.lower().startswith('cta:'):
-            ad_copy['cta'] = line.replace('CTA:', '').strip()
+    _parse_sections(text, _AD_COPY_RE, _AD_COPY_FIELDS, ad_copy)
     
     return ad_copy
 
 def parse_email_blocks_from_text(text: str) -> Dict[str, str]:
     """Parse email blocks from unstructured text."""
     email_blocks = {"subject_line": "", "header": "", "product_blurb": "", "cta_button": ""}
-    
-    lines = text.split('\n')
-    for line in lines:
-        line = line.strip()
-        if line.lower().startswith('subject:'):
-            email_blocks['subject_line'] = line.replace('Subject:', '').strip()
-        elif line.lower().startswith('header:'):
-            email_blocks['header'] = line.replace('Header:', '').strip()
-        elif line.lower().startswith('product:'):
-            email_blocks['product_blurb'] = line.replace('Product:', '').strip()
-        elif line.lower().startswith('cta:'):
-            email_blocks['cta_button'] = line.replace('CTA:', '').strip()
+    _parse_sections(text, _EMAIL_RE, _EMAIL_FIELDS, email_blocks)
     
     return email_blocks
+
+def _parse_json_fields(response: str, keys: Tuple[str, ...]) -> Optional[Dict[str, str]]:
+    """Read keys (matched case-insensitively) from a JSON object response, or return None if it is not one."""
+    data = _load_json_object(response)
+    if not isinstance(data, dict):
+        return None
+    data = {str(key).lower(): value for key, value in data.items()}
+    if not any(key in data for key in keys):
+        return None
+    
+    return {key: str(data.get(key) or "").strip() for key in keys}
+
+def _load_json_object(response: str) -> Any:
+    """Parse a JSON response, falling back to its outermost {...} when wrapped in prose or code fences.
+    
+    >>> _load_json_object('```json\\n{"headline": "Hi"}\\n```')
+    {'headline': 'Hi'}
+    """
+    try:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        start, end = response.find('{'), response.rfind('}')
+        if start == -1 or end < start:
+            return None
+        try:
+            return orjson.loads(response[start:end + 1])
+        except orjson.JSONDecodeError:
+            return None
+
+def _parse_sections(
+    text: str,
+    pattern: re.Pattern,
+    fields: Dict[str, str],
+    sections: Dict[str, str],
+    continuation: bool = False
+) -> None:
+    """Fill sections from "Label: value" lines matched by pattern in a single pass.
+    
+    With continuation, non-empty lines following a label are appended to its value.
+    """
+    matches = list(pattern.finditer(text))
+    for i, match in enumerate(matches):
+        value = match.group(2).strip()
+        if match.group(0).lstrip().startswith('"'):
+            # A "key": "value", line from JSON that did not parse
+            value = value.rstrip(',').strip().strip('"')
+        if continuation:
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            extra = [line.strip() for line in text[match.end():end].split('\n') if _is_text_line(line)]
+            value = " ".join([value] + extra)
+        sections[fields[match.group(1).lower()]] = value
+
+def _is_text_line(line: str) -> bool:
+    """Whether a line carries text, rather than being blank, a code fence or bare JSON punctuation."""
+    stripped = line.strip()
+    return bool(stripped.strip('{}[],')) and not stripped.startswith('```')
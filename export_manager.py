@@ -1,204 +1,337 @@
-import json
 import zipfile
 import io
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional, BinaryIO, Iterator, List, Tuple
 from datetime import datetime
+import orjson
+
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# orjson >= 3.9 can embed already-encoded JSON in a larger document
+_Fragment = getattr(orjson, "Fragment", None)
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | _JSON_OPTIONS)
+
+def _encode_once(obj: Any) -> Any:
+    """Pre-encode obj so several documents can embed it without re-serializing.
+    
+    The embedded JSON is compact; with orjson < 3.9 obj is returned unchanged.
+    """
+    if _Fragment is None:
+        return obj
+    return _Fragment(orjson.dumps(obj, option=_JSON_OPTIONS))
+
+@lru_cache(maxsize=256)
+def _title(key: str) -> str:
+    """Title-case a variation key; the same few keys repeat across every variation."""
+    return key.title()
+
+@lru_cache(maxsize=256)
+def _folder_name(content_type: str) -> str:
+    """Archive folder name for a content type."""
+    return content_type.lower().replace(" ", "_")
+
+# Platform exports with nothing to export; no timestamp, so they are built once
+_EMPTY_KLAVIYO_EXPORT = _dumps({"email_templates": []}).decode()
+_EMPTY_META_EXPORT = _dumps({"ad_sets": []}).decode()
+_EMPTY_TIKTOK_EXPORT = _dumps({"video_ads": []}).decode()
 
 class ExportManager:
     """Manages content export in various formats."""
     
-    def export_as_json(self, content: Dict[str, Any]) -> str:
-        """Export content as JSON string."""
+    # ZIP settings; deflate level 3 is much cheaper than the default 6 on text for a similar size
+    COMPRESSION = zipfile.ZIP_DEFLATED
+    COMPRESSION_LEVEL = 3
+    # Entries smaller than this are stored uncompressed, as deflate saves almost nothing on them
+    STORE_THRESHOLD = 4096
+    
+    # Platform name (lowercase) -> exporter method
+    _PLATFORM_EXPORTERS = {
+        "klaviyo": "_export_for_klaviyo",
+        "meta": "_export_for_meta",
+        "facebook": "_export_for_meta",
+        "tiktok": "_export_for_tiktok"
+    }
+    
+    def export_as_json(
+        self,
+        content: Dict[str, Any],
+        now: Optional[datetime] = None,
+        include_metadata: bool = True
+    ) -> str:
+        """Export content as JSON string, optionally without the metadata counts."""
+        export_data = self._build_export_data(content, now or datetime.now(), include_metadata=include_metadata)
+        return _dumps(export_data).decode()
+    
+    def _build_export_data(
+        self,
+        content: Dict[str, Any],
+        now: datetime,
+        encoded: Optional[Dict[str, Any]] = None,
+        total_variations: Optional[int] = None,
+        include_metadata: bool = True
+    ) -> Dict[str, Any]:
+        """Wrap content with a timestamp and metadata for JSON export.
+        
+        encoded, if given, replaces each content type's variations with its pre-encoded form;
+        total_variations, if given, is used instead of recounting the variations.
+        """
         export_data = {
-            "export_timestamp": datetime.now().isoformat(),
-            "content": content,
-            "metadata": {
+            # orjson serializes datetime in ISO 8601 format
+            "export_timestamp": now,
+            "content": encoded if encoded is not None else content
+        }
+        if include_metadata:
+            if total_variations is None:
+                total_variations = sum(len(variations) for variations in content.values())
+            export_data["metadata"] = {
                 "total_content_types": len(content),
-                "total_variations": sum(len(variations) for variations in content.values())
+                "total_variations": total_variations
             }
-        }
-        return json.dumps(export_data, indent=2, ensure_ascii=False)
+        return export_data
     
-    def export_as_text(self, content: Dict[str, Any]) -> str:
+    def export_as_text(self, content: Dict[str, Any], now: Optional[datetime] = None) -> str:
         """Export content as formatted text."""
-        text_lines = []
-        text_lines.append("CONTENT GENERATION EXPORT")
-        text_lines.append("=" * 50)
-        text_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        text_lines.append("")
+        return "\n".join(self._iter_text_lines(content, now or datetime.now()))
+    
+    def _iter_text_lines(self, content: Dict[str, Any], now: datetime) -> Iterator[str]:
+        """Yield the lines of the text export."""
+        yield "CONTENT GENERATION EXPORT"
+        yield "=" * 50
+        yield f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}"
+        yield ""
         
         for content_type, variations in content.items():
-            text_lines.append(f"\n{content_type.upper()}")
-            text_lines.append("-" * len(content_type))
+            yield f"\n{content_type.upper()}"
+            yield "-" * len(content_type)
             
             for i, variation in enumerate(variations, 1):
-                text_lines.append(f"\nVariation {i}:")
-                
-                if isinstance(variation, dict):
-                    for key, value in variation.items():
-                        if isinstance(value, list):
-                            text_lines.append(f"  {key.title()}:")
-                            for item in value:
-                                text_lines.append(f"    - {item}")
-                        else:
-                            text_lines.append(f"  {key.title()}: {value}")
-                else:
-                    text_lines.append(f"  {variation}")
-                
-                text_lines.append("")
+                yield f"\nVariation {i}:"
+                formatted = self._format_structured_variation(variation, indent="  ", item_indent="    ")
+                if formatted:
+                    yield formatted
+                yield ""
+    
+    @staticmethod
+    def _format_structured_variation(variation: Any, indent: str = "", item_indent: str = "") -> str:
+        """Format one variation as "Key: value" lines, with "- item" bullets for list values."""
+        if not isinstance(variation, dict):
+            return f"{indent}{variation}"
         
-        return "\n".join(text_lines)
+        lines = []
+        for key, value in variation.items():
+            if isinstance(value, list):
+                lines.append(f"{indent}{_title(key)}:")
+                lines.extend(f"{item_indent}- {item}" for item in value)
+            else:
+                lines.append(f"{indent}{_title(key)}: {value}")
+        return "\n".join(lines)
     
-    def export_as_zip(self, content: Dict[str, Any]) -> bytes:
+    def export_as_zip(
+        self,
+        content: Dict[str, Any],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None
+    ) -> bytes:
         """Export content as ZIP file with separate files for each content type."""
         buffer = io.BytesIO()
+        self.export_as_zip_to(buffer, content, compression, compresslevel)
+        return buffer.getvalue()
+    
+    def export_as_zip_view(
+        self,
+        content: Dict[str, Any],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None
+    ) -> memoryview:
+        """Export content as a ZIP archive exposed as a memoryview over the in-memory buffer.
         
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        Avoids copying the archive into a new bytes object; the view keeps the buffer
+        alive until it is released (view.release()) or garbage collected.
+        """
+        buffer = io.BytesIO()
+        self.export_as_zip_to(buffer, content, compression, compresslevel)
+        return buffer.getbuffer()
+    
+    def export_as_zip_to(
+        self,
+        stream: BinaryIO,
+        content: Dict[str, Any],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None
+    ) -> None:
+        """Write the ZIP export directly to a writable binary stream.
+        
+        The stream need not be seekable, so an open file or an HTTP response body
+        can be passed to write the archive without holding it all in memory.
+        compression and compresslevel default to the class-level settings.
+        """
+        # One timestamp for every file in the archive
+        now = datetime.now()
+        if compression is None:
+            compression = self.COMPRESSION
+        if compresslevel is None:
+            compresslevel = self.COMPRESSION_LEVEL
+        
+        date_time = now.timetuple()[:6]
+        
+        with zipfile.ZipFile(stream, 'w', compression, compresslevel=compresslevel) as zip_file:
+            # One pass over content for the folder names (shared by the entries and the README),
+            # the encoded variations (embedded by both JSON files) and the variation count
+            folder_map = {}
+            encoded = {}
+            total_variations = 0
+            for content_type, variations in content.items():
+                folder_map[content_type] = _folder_name(content_type)
+                encoded[content_type] = _encode_once(variations)
+                total_variations += len(variations)
+            
             # Add main JSON file
-            json_content = self.export_as_json(content)
-            zip_file.writestr("content_export.json", json_content)
+            export_data = self._build_export_data(content, now, encoded, total_variations)
+            self._writestr(zip_file, "content_export.json", _dumps(export_data), date_time)
             
             # Add formatted text file
-            text_content = self.export_as_text(content)
-            zip_file.writestr("content_export.txt", text_content)
+            text_content = self.export_as_text(content, now).encode("utf-8")
+            self._writestr(zip_file, "content_export.txt", text_content, date_time)
             
             # Add individual files for each content type
             for content_type, variations in content.items():
-                folder_name = content_type.lower().replace(" ", "_")
-                
-                for i, variation in enumerate(variations, 1):
-                    filename = f"{folder_name}/variation_{i}.txt"
-                    
-                    if isinstance(variation, dict):
-                        # Format structured content
-                        content_text = []
-                        for key, value in variation.items():
-                            if isinstance(value, list):
-                                content_text.append(f"{key.title()}:")
-                                for item in value:
-                                    content_text.append(f"- {item}")
-                            else:
-                                content_text.append(f"{key.title()}: {value}")
-                        file_content = "\n".join(content_text)
-                    else:
-                        file_content = str(variation)
-                    
-                    zip_file.writestr(filename, file_content)
-                
-                # Add JSON file for structured data
-                json_filename = f"{folder_name}/data.json"
-                json_data = {
-                    "content_type": content_type,
-                    "variations": variations,
-                    "count": len(variations)
-                }
-                zip_file.writestr(json_filename, json.dumps(json_data, indent=2))
+                entries = self._render_content_type(
+                    content_type, folder_map[content_type], variations, encoded[content_type]
+                )
+                for filename, file_content in entries:
+                    self._writestr(zip_file, filename, file_content, date_time)
             
             # Add README
-            readme_content = self._generate_readme(content)
-            zip_file.writestr("README.txt", readme_content)
-        
-        buffer.seek(0)
-        return buffer.read()
+            readme_content = self._generate_readme(folder_map, now).encode("utf-8")
+            self._writestr(zip_file, "README.txt", readme_content, date_time)
     
-    def _generate_readme(self, content: Dict[str, Any]) -> str:
-        """Generate README content for the export."""
-        readme_lines = [
-            "CONTENT GENERATION EXPORT",
-            "=" * 50,
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "CONTENTS:",
-            "- content_export.json: Complete export in JSON format",
-            "- content_export.txt: Formatted text version",
-            "- Individual folders for each content type:",
+    def _render_content_type(
+        self,
+        content_type: str,
+        folder_name: str,
+        variations: List[Any],
+        payload: Any
+    ) -> List[Tuple[str, bytes]]:
+        """Render the variation files and data.json for one content type as (filename, UTF-8 data) pairs."""
+        entries = [
+            (f"{folder_name}/variation_{i}.txt", self._format_structured_variation(variation).encode("utf-8"))
+            for i, variation in enumerate(variations, 1)
         ]
         
-        for content_type in content.keys():
-            folder_name = content_type.lower().replace(" ", "_")
-            readme_lines.append(f"  - {folder_name}/: {content_type} variations")
+        # Add JSON file for structured data
+        json_data = {
+            "content_type": content_type,
+            "variations": payload,
+            "count": len(variations)
+        }
+        entries.append((f"{folder_name}/data.json", _dumps(json_data)))
+        return entries
+    
+    def _writestr(self, zip_file: zipfile.ZipFile, name: str, data: bytes, date_time: Tuple[int, ...]) -> None:
+        """Add an entry to the archive, storing payloads below STORE_THRESHOLD uncompressed."""
+        info = zipfile.ZipInfo(name, date_time=date_time)
+        info.external_attr = 0o644 << 16
+        if len(data) < self.STORE_THRESHOLD:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zip_file.compression
+        # A ZipInfo entry ignores the archive's level unless it is passed explicitly
+        zip_file.writestr(info, data, compresslevel=zip_file.compresslevel)
+    
+    def _generate_readme(self, folder_map: Dict[str, str], now: datetime) -> str:
+        """Generate README content for the export."""
+        return "\n".join(self._iter_readme_lines(folder_map, now))
+    
+    def _iter_readme_lines(self, folder_map: Dict[str, str], now: datetime) -> Iterator[str]:
+        """Yield the lines of the README, listing each content type's folder."""
+        yield "CONTENT GENERATION EXPORT"
+        yield "=" * 50
+        yield f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}"
+        yield ""
+        yield "CONTENTS:"
+        yield "- content_export.json: Complete export in JSON format"
+        yield "- content_export.txt: Formatted text version"
+        yield "- Individual folders for each content type:"
         
-        readme_lines.extend([
-            "",
-            "STRUCTURE:",
-            "Each content type folder contains:",
-            "- variation_X.txt: Individual variation files",
-            "- data.json: Structured data for the content type",
-            "",
-            "USAGE:",
-            "Import the JSON files into your marketing tools or",
-            "copy text from individual variation files as needed."
-        ])
+        for content_type, folder_name in folder_map.items():
+            yield f"  - {folder_name}/: {content_type} variations"
         
-        return "\n".join(readme_lines)
+        yield ""
+        yield "STRUCTURE:"
+        yield "Each content type folder contains:"
+        yield "- variation_X.txt: Individual variation files"
+        yield "- data.json: Structured data for the content type"
+        yield ""
+        yield "USAGE:"
+        yield "Import the JSON files into your marketing tools or"
+        yield "copy text from individual variation files as needed."
     
-    def export_for_platform(self, content: Dict[str, Any], platform: str) -> str:
+    def export_for_platform(self, content: Dict[str, Any], platform: str, now: Optional[datetime] = None) -> str:
         """Export content formatted for specific platforms."""
-        if platform.lower() == "klaviyo":
-            return self._export_for_klaviyo(content)
-        elif platform.lower() in ["meta", "facebook"]:
-            return self._export_for_meta(content)
-        elif platform.lower() == "tiktok":
-            return self._export_for_tiktok(content)
-        else:
-            return self.export_as_json(content)
+        method = self._PLATFORM_EXPORTERS.get(platform.lower())
+        if method is None:
+            return self.export_as_json(content, now)
+        return getattr(self, method)(content, now)
     
-    def _export_for_klaviyo(self, content: Dict[str, Any]) -> str:
+    def _export_for_klaviyo(self, content: Dict[str, Any], now: Optional[datetime] = None) -> str:
         """Format content for Klaviyo email campaigns."""
+        variations = content.get("Email Creative Blocks")
+        if not variations:
+            return _EMPTY_KLAVIYO_EXPORT
+        
         klaviyo_data = {
-            "email_templates": [],
-            "export_timestamp": datetime.now().isoformat()
+            "email_templates": [
+                {
+                    "subject_line": variation.get("subject_line", ""),
+                    "header": variation.get("header", ""),
+                    "body": variation.get("product_blurb", ""),
+                    "cta_text": variation.get("cta_button", "")
+                }
+                for variation in variations if isinstance(variation, dict)
+            ],
+            "export_timestamp": now or datetime.now()
         }
-        
-        if "Email Creative Blocks" in content:
-            for variation in content["Email Creative Blocks"]:
-                if isinstance(variation, dict):
-                    template = {
-                        "subject_line": variation.get("subject_line", ""),
-                        "header": variation.get("header", ""),
-                        "body": variation.get("product_blurb", ""),
-                        "cta_text": variation.get("cta_button", "")
-                    }
-                    klaviyo_data["email_templates"].append(template)
-        
-        return json.dumps(klaviyo_data, indent=2)
+        return _dumps(klaviyo_data).decode()
     
-    def _export_for_meta(self, content: Dict[str, Any]) -> str:
+    def _export_for_meta(self, content: Dict[str, Any], now: Optional[datetime] = None) -> str:
         """Format content for Meta/Facebook Ads."""
+        variations = content.get("Ad Copy")
+        if not variations:
+            return _EMPTY_META_EXPORT
+        
         meta_data = {
-            "ad_sets": [],
-            "export_timestamp": datetime.now().isoformat()
+            "ad_sets": [
+                {
+                    "headline": variation.get("headline", ""),
+                    "description": variation.get("subtext", ""),
+                    "call_to_action": variation.get("cta", ""),
+                    "format": "single_image"
+                }
+                for variation in variations if isinstance(variation, dict)
+            ],
+            "export_timestamp": now or datetime.now()
         }
-        
-        if "Ad Copy" in content:
-            for variation in content["Ad Copy"]:
-                if isinstance(variation, dict):
-                    ad_set = {
-                        "headline": variation.get("headline", ""),
-                        "description": variation.get("subtext", ""),
-                        "call_to_action": variation.get("cta", ""),
-                        "format": "single_image"
-                    }
-                    meta_data["ad_sets"].append(ad_set)
-        
-        return json.dumps(meta_data, indent=2)
+        return _dumps(meta_data).decode()
     
-    def _export_for_tiktok(self, content: Dict[str, Any]) -> str:
+    def _export_for_tiktok(self, content: Dict[str, Any], now: Optional[datetime] = None) -> str:
         """Format content for TikTok Ads."""
+        variations = content.get("Video Scripts")
+        if not variations:
+            return _EMPTY_TIKTOK_EXPORT
+        
         tiktok_data = {
-            "video_ads": [],
-            "export_timestamp": datetime.now().isoformat()
+            "video_ads": [
+                {
+                    "script": variation.get("main_content", ""),
+                    "hook": variation.get("hook", ""),
+                    "cta": variation.get("cta", ""),
+                    "duration": variation.get("duration", "30-60 seconds")
+                }
+                for variation in variations if isinstance(variation, dict)
+            ],
+            "export_timestamp": now or datetime.now()
         }
-        
-        if "Video Scripts" in content:
-            for variation in content["Video Scripts"]:
-                if isinstance(variation, dict):
-                    ad = {
-                        "script": variation.get("main_content", ""),
-                        "hook": variation.get("hook", ""),
-                        "cta": variation.get("cta", ""),
-                        "duration": variation.get("duration", "30-60 seconds")
-                    }
-                    tiktok_data["video_ads"].append(ad)
-        
-        return json.dumps(tiktok_data, indent=2)
+        return _dumps(tiktok_data).decode()
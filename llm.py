@@ -0,0 +1,41 @@
+import os
+import importlib.util
+from typing import Optional
+import httpx
+import streamlit as st
+from dotenv import load_dotenv, find_dotenv
+from langchain_groq import ChatGroq
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Model settings (also part of the response cache key)
+MODEL_NAME = "llama3-8b-8192"
+TEMPERATURE = 0.3
+MAX_TOKENS = 512
+
+# Connection pool for the Groq API; HTTP/2 multiplexes concurrent calls over one connection when h2 is installed
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+HTTP_TIMEOUT = 30.0
+
+def load_llm(groq_api_key: Optional[str] = None) -> ChatGroq:
+    """Load Groq LLM instance."""
+    api_key = groq_api_key or os.environ.get("GROQ_API_KEY", "---")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY is required")
+    return ChatGroq(
+        groq_api_key=api_key,
+        model_name=MODEL_NAME,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        # Retries are handled by content_generator, which knows which errors are worth retrying
+        max_retries=0,
+        http_client=httpx.Client(http2=HTTP2_ENABLED, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT),
+        http_async_client=httpx.AsyncClient(http2=HTTP2_ENABLED, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+@st.cache_resource
+def get_llm() -> ChatGroq:
+    """Get the shared LLM instance, created once per process and reused across reruns and threads."""
+    return load_llm()
@@ -1,25 +1,45 @@
-def get_prompt_templates():
-    """Get all prompt templates as a dictionary."""
-    return {
-        "ad_copy": """You are a professional copywriter creating compelling ad copy. Generate advertising copy based on the following context and product information.
+import string
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+# Templates keep instructions, brand context and product first so every
+# call for the same brand and content type shares an identical prefix.
+# Built once at import and read-only, so the shared mapping cannot be mutated.
+_PROMPT_TEMPLATES: Mapping[str, str] = MappingProxyType({
+    "ad_copy": """You are a professional copywriter creating compelling ad copy. Generate advertising copy based on the following context and product information.
 
 {brand_context}
 
 Product/Campaign: {product_prompt}
 
-Create compelling ad copy with the following structure:
-Headline: [Create an attention-grabbing headline that hooks the audience]
-Subtext: [Write persuasive subtext that explains the value proposition]
-CTA: [Create a strong call-to-action button text]
+Create compelling ad copy and return it as a JSON object with these keys:
+"headline": an attention-grabbing headline that hooks the audience
+"subtext": persuasive subtext that explains the value proposition
+"cta": a strong call-to-action button text
 
 Make sure the copy is engaging, benefit-focused, and matches the specified brand tone. Keep headlines under 60 characters and subtext under 150 characters.""",
 
-        "social_caption": """You are a social media expert creating engaging captions for {platform}. Generate a caption based on the following context and product information.
+    "ad_copy_batch": """You are a professional copywriter creating compelling ad copy. Generate advertising copy based on the following context and product information.
 
 {brand_context}
 
 Product/Campaign: {product_prompt}
 
+Create {num_variations} distinct ad copy variations. Return a JSON object with a "variations" key holding an array of exactly {num_variations} objects, each with these keys:
+"headline": an attention-grabbing headline that hooks the audience
+"subtext": persuasive subtext that explains the value proposition
+"cta": a strong call-to-action button text
+
+Make sure each variation is engaging, benefit-focused, matches the specified brand tone, and takes a different angle from the others. Keep headlines under 60 characters and subtext under 150 characters.""",
+
+    "social_caption": """You are a social media expert creating engaging captions. Generate a caption based on the following context and product information.
+
+{brand_context}
+
+Product/Campaign: {product_prompt}
+
+Platform: {platform}
+
 Create an engaging {platform} caption that includes:
 - Hook that grabs attention in the first line
 - Compelling product description
@@ -28,21 +48,21 @@ Create an engaging {platform} caption that includes:
 
 Match the brand tone and make it platform-appropriate. For Instagram: focus on visual storytelling. For TikTok: use trending language and emojis. For LinkedIn: professional tone.""",
 
-        "email": """You are an email marketing specialist creating email campaign content. Generate email creative blocks based on the following context and product information.
+    "email": """You are an email marketing specialist creating email campaign content. Generate email creative blocks based on the following context and product information.
 
 {brand_context}
 
 Product/Campaign: {product_prompt}
 
-Create email content with the following structure:
-Subject: [Create a compelling subject line that increases open rates]
-Header: [Write an engaging email header/greeting]
-Product: [Create persuasive product description with benefits]
-CTA: [Create a strong call-to-action button text]
+Create email content and return it as a JSON object with these keys:
+"subject_line": a compelling subject line that increases open rates
+"header": an engaging email header/greeting
+"product_blurb": a persuasive product description with benefits
+"cta_button": a strong call-to-action button text
 
 Make sure the content drives engagement and conversions. Keep subject lines under 50 characters and focus on benefits over features.""",
 
-        "video_script": """You are a content creator writing scripts for short-form videos (30-60 seconds). Create a UGC-style video script based on the following context and product information.
+    "video_script": """You are a content creator writing scripts for short-form videos (30-60 seconds). Create a UGC-style video script based on the following context and product information.
 
 {brand_context}
 
@@ -57,7 +77,7 @@ Create a video script with:
 
 Format as a natural speaking script that feels authentic and not overly promotional. Include timing suggestions and key visual moments.""",
 
-        "image_prompt": """You are an art director creating prompts for AI image generation tools like DALL-E or Midjourney. Generate detailed image prompts based on the following context and product information.
+    "image_prompt": """You are an art director creating prompts for AI image generation tools like DALL-E or Midjourney. Generate detailed image prompts based on the following context and product information.
 
 {brand_context}
 
@@ -77,7 +97,7 @@ Each prompt should include:
 
 Make prompts detailed enough to generate professional-quality marketing visuals.""",
 
-        "edit": """You are a professional editor improving marketing content. Edit the following content based on the specific instruction provided.
+    "edit": """You are a professional editor improving marketing content. Edit the following content based on the specific instruction provided.
 
 {brand_context}
 
@@ -87,4 +107,35 @@ Original Content ({content_type}):
 Edit Instruction: {edit_instruction}
 
 Provide the improved version maintaining the same format and structure as the original. Make sure the edit follows the instruction while keeping the content effective and on-brand."""
-    }
+})
+
+def get_prompt_templates() -> Mapping[str, str]:
+    """Get all prompt templates as a read-only mapping."""
+    return _PROMPT_TEMPLATES
+
+def _compile_template(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """Parse a template once into literal chunks and field names, returning a function that fills it."""
+    chunks = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            # Anything beyond a plain {name} field is left to str.format
+            return template.format_map
+        chunks.append((literal, field_name))
+
+    def fill(values: Mapping[str, Any]) -> str:
+        parts = []
+        for literal, field_name in chunks:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(values[field_name]))
+        return "".join(parts)
+
+    return fill
+
+_COMPILED_TEMPLATES: Mapping[str, Callable[[Mapping[str, Any]], str]] = MappingProxyType(
+    {name: _compile_template(template) for name, template in _PROMPT_TEMPLATES.items()}
+)
+
+def render(name: str, **kwargs: Any) -> str:
+    """Fill the named template; equivalent to get_prompt_templates()[name].format(**kwargs)."""
+    return _COMPILED_TEMPLATES[name](kwargs)
@@ -0,0 +1,234 @@
+import atexit
+import hashlib
+import json
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    # Optional: BLAKE3 hashes long prompts faster than SHA-256 on CPUs without SHA extensions
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+# Words and single symbols; sentence punctuation is dropped, symbols such as $ and % are kept
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_IGNORED_PUNCTUATION = frozenset(".,;:!?\"'()[]{}")
+
+class ResponseCache:
+    """Cache of LLM responses for exact and, optionally, normalized prompts, in memory with an on-disk backing store."""
+
+    def __init__(
+        self,
+        storage_file: str = "response_cache",
+        maxsize: int = 1024,
+        ttl: int = 86400,
+        max_disk_entries: int = 8192
+    ):
+        self.storage_file = storage_file
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.stats = {"hits": 0, "normalized_hits": 0, "misses": 0}
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk store handle, opened on first use and kept open; dbm writes its index on close
+        self._db: Optional[shelve.Shelf] = None
+        self._disk_failed = False
+        self._disk_count = 0
+        atexit.register(self.close)
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        prompt: str,
+        variation: int = 0,
+        json_mode: bool = False
+    ) -> str:
+        """Build a stable cache key for a single LLM call."""
+        payload = json.dumps(
+            {"m": model_name, "t": temperature, "mx": max_tokens, "p": prompt, "v": variation, "j": json_mode},
+            sort_keys=True
+        )
+        data = payload.encode("utf-8")
+        if _blake3 is not None:
+            return _blake3(data).hexdigest(length=16)
+        return hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    def make_normalized_key(
+        cls,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        prompt: str,
+        variation: int = 0,
+        json_mode: bool = False
+    ) -> str:
+        """Build a key that ignores case, whitespace and sentence punctuation; word order still matters."""
+        tokens = [token for token in _TOKEN_RE.findall(prompt.lower()) if token not in _IGNORED_PUNCTUATION]
+        return "n:" + cls.make_key(model_name, temperature, max_tokens, " ".join(tokens), variation, json_mode)
+
+    def get(self, key: str, normalized_key: Optional[str] = None) -> Optional[str]:
+        """Return the cached response for key (or, if given, normalized_key), or None on a miss."""
+        with self._lock:
+            content = self._lookup(key)
+            if content is not None:
+                self.stats["hits"] += 1
+                return content
+
+            if normalized_key:
+                content = self._lookup(normalized_key)
+                if content is not None:
+                    self.stats["normalized_hits"] += 1
+                    return content
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, content: str, normalized_key: Optional[str] = None) -> None:
+        """Store a successful response under key and, optionally, its normalized key."""
+        entry = (time.time() + self.ttl, content)
+        keys = [key, normalized_key] if normalized_key else [key]
+        with self._lock:
+            for k in keys:
+                self._remember(k, entry)
+
+            db = self._disk()
+            if db is None:
+                # The in-memory copy is still usable if the disk store is unavailable
+                return
+            try:
+                for k in keys:
+                    if k not in db:
+                        self._disk_count += 1
+                    db[k] = entry
+                if self._disk_count > self.max_disk_entries:
+                    self._compact()
+            except Exception:
+                pass
+
+    def clear(self) -> None:
+        """Drop all cached responses and reset stats."""
+        with self._lock:
+            self._memory.clear()
+            self.stats = {"hits": 0, "normalized_hits": 0, "misses": 0}
+            self._close_disk()
+            try:
+                self._db = shelve.open(self.storage_file, flag="n")
+                self._disk_count = 0
+            except Exception:
+                self._disk_failed = True
+
+    def close(self) -> None:
+        """Write out and close the disk store; it is reopened on next use."""
+        with self._lock:
+            self._close_disk()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters."""
+        return dict(self.stats)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """Find an unexpired entry in memory, falling back to disk; expired entries are deleted."""
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._read_disk(key)
+            if entry is None:
+                return None
+            self._remember(key, entry)
+        elif entry[0] <= time.time():
+            del self._memory[key]
+            self._delete_disk(key)
+            return None
+
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry when full."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _disk(self) -> Optional[shelve.Shelf]:
+        """Get the open disk store, opening and pruning it on first use; None if it is unavailable."""
+        if self._db is None and not self._disk_failed:
+            try:
+                self._db = shelve.open(self.storage_file)
+                self._disk_count = len(self._db)
+                self._compact()
+            except Exception:
+                # Missing or unreadable store behaves like an empty cache, without retrying on every call
+                self._close_disk()
+                self._disk_failed = True
+        return self._db
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        """Read an unexpired entry from the disk store, deleting it if it has expired."""
+        db = self._disk()
+        if db is None:
+            return None
+        try:
+            entry = db.get(key)
+        except Exception:
+            return None
+        if entry is not None and entry[0] <= time.time():
+            self._delete_disk(key)
+            return None
+        return entry
+
+    def _delete_disk(self, key: str) -> None:
+        """Remove an entry from the disk store, if present."""
+        db = self._disk()
+        if db is None:
+            return
+        try:
+            if key in db:
+                del db[key]
+                self._disk_count -= 1
+        except Exception:
+            pass
+
+    def _compact(self) -> None:
+        """Rewrite the disk store without expired entries, keeping the newest if it is over max_disk_entries.
+        
+        Rewriting (rather than deleting keys) also reclaims the space dbm.dumb never reuses.
+        """
+        now = time.time()
+        live = []
+        for k in list(self._db.keys()):
+            try:
+                entry = self._db[k]
+            except Exception:
+                continue
+            if entry[0] > now:
+                live.append((k, entry))
+
+        if len(live) > self.max_disk_entries:
+            # Trim below the cap so the next rewrite is not one insert away
+            live.sort(key=lambda item: item[1][0], reverse=True)
+            live = live[:self.max_disk_entries * 3 // 4]
+        elif len(live) == self._disk_count:
+            return
+
+        self._db.close()
+        self._db = shelve.open(self.storage_file, flag="n")
+        for k, entry in live:
+            self._db[k] = entry
+        self._disk_count = len(live)
+
+    def _close_disk(self) -> None:
+        """Close the disk store handle, if open."""
+        if self._db is not None:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+            self._db = None